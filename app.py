@@ -164,11 +164,7 @@ def _commit_from_raw_flow(repo: RepoState) -> Dict[str, str]:
 
 
 def _list_versions(repo: RepoState) -> Dict[str, str]:
-    logs = [
-        record
-        for record in repo.read_logs()
-        if record.get("event_type", "commit") == "commit" and record.get("version_id")
-    ]
+    logs = repo.iter_commits()
     head = repo.get_head()
     print(f"\nCurrent HEAD: {head}")
 
@@ -200,12 +196,7 @@ def _list_versions(repo: RepoState) -> Dict[str, str]:
 
 
 def _find_version_record(repo: RepoState, version_id: str) -> Optional[Dict]:
-    for record in repo.read_logs():
-        if record.get("event_type", "commit") != "commit":
-            continue
-        if str(record.get("version_id")) == version_id:
-            return record
-    return None
+    return repo.get_version_record(version_id)
 
 
 def _print_version_details(record: Dict) -> None:
@@ -223,11 +214,7 @@ def _print_version_details(record: Dict) -> None:
 
 
 def _select_version_interactively(repo: RepoState) -> Optional[str]:
-    logs = [
-        record
-        for record in repo.read_logs()
-        if record.get("event_type", "commit") == "commit" and record.get("version_id")
-    ]
+    logs = repo.iter_commits()
     if not logs:
         raise DataLineageError("No versions available to checkout.")
 
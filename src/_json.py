@@ -0,0 +1,53 @@
+"""JSON encode/decode helpers with an optional orjson fast path.
+
+orjson serializes straight to UTF-8 bytes several times faster than the
+stdlib; when it is not installed everything falls back to ``json`` with
+matching output for the data shapes this project stores.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def loads(payload: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(payload)
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        payload = bytes(payload).decode("utf-8")
+    return json.loads(payload)
+
+
+def dumps_canonical(data: Any) -> bytes:
+    """Compact, key-sorted encoding used for hashing."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return canonical.encode("utf-8")
+
+
+def dumps_compact(data: Any, trailing_newline: bool = False) -> bytes:
+    """Compact encoding for machine-read files and log lines."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if trailing_newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, option=option)
+    encoded = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return encoded + b"\n" if trailing_newline else encoded
+
+
+def dumps_pretty(data: Any, sort_keys: bool = False, trailing_newline: bool = False) -> bytes:
+    """Indented encoding for files a human is expected to read."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if trailing_newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, option=option)
+    encoded = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=sort_keys).encode("utf-8")
+    return encoded + b"\n" if trailing_newline else encoded
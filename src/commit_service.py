@@ -1,33 +1,141 @@
-import json
+import io
+import mmap
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX platforms
+    fcntl = None
 
 import pandas as pd
 
+from src import _json
 from src.hasher import (
-    dataframe_to_stable_csv_bytes,
-    sha256_from_bytes,
-    sha256_from_json,
+    HASH_ALGORITHM,
+    HASH_VERSION,
+    build_version_hash,
+    digest_from_buffer,
+    digest_from_json,
+    stream_dataframe_to_stable_csv,
 )
 from src.io_loader import load_dataset, read_config, validate_schema
-from src.errors import DataLineageError
+from src.errors import DataLineageError, ValidationError
 from src.models import VersionRecord
-from src.preprocess import apply_deterministic_preprocessing, get_default_preprocess_config
+from src.preprocess import (
+    PREPROCESS_VERSION,
+    apply_deterministic_preprocessing,
+    get_default_preprocess_config,
+)
 from src.repo import RepoState
 
 
 def _label_distribution(processed_rows) -> Dict[str, int]:
     if "label" not in processed_rows.columns:
         return {}
-    distribution = processed_rows["label"].value_counts(dropna=False).to_dict()
-    return {str(key): int(value) for key, value in distribution.items()}
+    distribution = processed_rows["label"].value_counts(dropna=False)
+    # Convert index and counts to native types in one vectorized pass each
+    # instead of a per-item Python dict comprehension.
+    return dict(zip(distribution.index.map(str).tolist(), distribution.tolist()))
 
 
 def _now_utc_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
+# Linux FICLONE ioctl: O(1) reflink copy on filesystems that support it.
+_FICLONE = 0x40049409
+
+
+def _copy_file(source: Path, destination: Path) -> None:
+    """Copy a file without pulling its contents into user space.
+
+    Tries an O(1) reflink first (XFS/Btrfs), then a sendfile loop, and
+    falls back to shutil.copyfile on platforms without either.
+    """
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, "sendfile"):
+            try:
+                size = os.fstat(src.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                if offset >= size:
+                    return
+            except OSError:
+                pass
+    shutil.copyfile(source, destination)
+
+
+def _map_dataset_file(dataset_file: Path) -> mmap.mmap:
+    """Map the dataset read-only so hashing and parsing share one read."""
+    with open(dataset_file, "rb") as handle:
+        try:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as error:
+            raise ValidationError(f"Dataset file is empty: {dataset_file}") from error
+
+
+@lru_cache(maxsize=8)
+def _load_head_processed(version_id: str, processed_path: str) -> Tuple[str, pd.DataFrame]:
+    """Load a version's processed snapshot once and keep it around.
+
+    Versions are immutable and addressed by hash, so cached entries never
+    go stale. Repeated commit-from-HEAD runs against the same version
+    skip the re-read and re-parse entirely.
+    """
+    mapping = _map_dataset_file(Path(processed_path))
+    buffer = memoryview(mapping)
+    try:
+        input_hash = digest_from_buffer(buffer)
+        dataframe = pd.read_csv(io.BytesIO(buffer))
+    finally:
+        buffer.release()
+        mapping.close()
+    return input_hash, dataframe
+
+
+def _hash_and_load_dataset(repo: RepoState, dataset_file: Path, dataset_path: str):
+    """Hash the mapped input while pandas parses it.
+
+    hashlib/blake3 and the CSV parser both release the GIL, so the digest
+    runs on a worker thread concurrently with the parse instead of as a
+    second sequential pass over the mapping.
+    """
+    cached_input_hash = repo.get_cached_input_hash(dataset_file)
+    mapping = _map_dataset_file(dataset_file)
+    raw_buffer = memoryview(mapping)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            hash_future = (
+                None
+                if cached_input_hash is not None
+                else executor.submit(digest_from_buffer, raw_buffer)
+            )
+            raw_dataframe, _ = load_dataset(dataset_path, buffer=raw_buffer)
+            input_hash = cached_input_hash if hash_future is None else hash_future.result()
+    finally:
+        raw_buffer.release()
+        mapping.close()
+    if cached_input_hash is None:
+        repo.store_input_hash(dataset_file, input_hash)
+    return input_hash, raw_dataframe
+
+
 def _normalize_user_path(path_value: str) -> str:
     normalized = path_value.strip()
     if len(normalized) >= 2 and normalized[0] == normalized[-1] and normalized[0] in {'"', "'"}:
@@ -35,44 +143,67 @@ def _normalize_user_path(path_value: str) -> str:
     return normalized
 
 
+def _find_existing_version(
+    repo: RepoState,
+    input_hash: str,
+    config_hash: str,
+    source_data_path: str,
+    source_config_path: str,
+) -> Optional[Dict[str, Any]]:
+    """Dedupe check that runs before preprocessing.
+
+    The version id is derived from (input_hash, config_hash,
+    PREPROCESS_VERSION), so a duplicate is detectable from the hashes
+    alone and the whole preprocess + serialize cost is skipped. Returns
+    the duplicate result dict, or None when the version does not exist.
+    """
+    version_id = build_version_hash(input_hash, config_hash, PREPROCESS_VERSION)
+    if not (repo.versions_root / version_id).exists():
+        return None
+
+    dedupe_event = {
+        "event_type": "dedupe_hit",
+        "timestamp": _now_utc_iso(),
+        "requested_source_data_path": source_data_path,
+        "requested_source_config_path": source_config_path,
+        "requested_input_hash": input_hash,
+        "requested_config_hash": config_hash,
+        "resolved_version_id": version_id,
+        "message": "Run recorded. No new version created; existing version reused.",
+    }
+    with repo.transaction():
+        repo.append_log(dedupe_event)
+    return {
+        "status": "duplicate",
+        "version_id": version_id,
+        "head": repo.get_head(),
+        "message": "Identical input and config already committed.",
+    }
+
+
 def _persist_version(
     repo: RepoState,
     source_data_path: str,
     source_config_path: str,
-    input_bytes: bytes,
+    input_file: Path,
+    input_hash: str,
+    config_hash: str,
     raw_dataframe,
     processed_dataframe,
     config: Dict[str, Any],
     commit_message: str,
 ) -> Dict[str, Any]:
-    processed_csv_bytes = dataframe_to_stable_csv_bytes(processed_dataframe)
-
-    input_hash = sha256_from_bytes(input_bytes)
-    config_hash = sha256_from_json(config)
-    version_hash = sha256_from_bytes(processed_csv_bytes)
+    version_hash = build_version_hash(input_hash, config_hash, PREPROCESS_VERSION)
 
     parent_id = repo.get_head()
     version_dir = repo.versions_root / version_hash
     timestamp = _now_utc_iso()
 
-    if version_dir.exists():
-        dedupe_event = {
-            "event_type": "dedupe_hit",
-            "timestamp": timestamp,
-            "requested_source_data_path": source_data_path,
-            "requested_source_config_path": source_config_path,
-            "requested_input_hash": input_hash,
-            "requested_config_hash": config_hash,
-            "resolved_version_id": version_hash,
-            "message": "Run recorded. No new version created; existing version reused.",
-        }
-        repo.append_log(dedupe_event)
-        return {
-            "status": "duplicate",
-            "version_id": version_hash,
-            "head": repo.get_head(),
-            "message": "Identical processed output already committed.",
-        }
+    duplicate = _find_existing_version(
+        repo, input_hash, config_hash, source_data_path, source_config_path
+    )
+    if duplicate is not None:
+        return duplicate
 
     version_dir.mkdir(parents=True, exist_ok=False)
 
@@ -81,12 +212,9 @@ def _persist_version(
     config_snapshot_path = version_dir / "config_snapshot.json"
     metadata_path = version_dir / "metadata.json"
 
-    raw_snapshot_path.write_bytes(input_bytes)
-    processed_snapshot_path.write_bytes(processed_csv_bytes)
-    config_snapshot_path.write_text(
-        json.dumps(config, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
+    _copy_file(input_file, raw_snapshot_path)
+    processed_hash = stream_dataframe_to_stable_csv(processed_dataframe, processed_snapshot_path)
+    config_snapshot_path.write_bytes(_json.dumps_pretty(config, sort_keys=True, trailing_newline=True))
 
     record = VersionRecord(
         version_id=version_hash,
@@ -106,6 +234,12 @@ def _persist_version(
     metadata: Dict[str, Any] = {
         "event_type": "commit",
         **record.to_dict(),
+        "hash_algorithm": HASH_ALGORITHM,
+        "hash_version": HASH_VERSION,
+        "preprocess_version": PREPROCESS_VERSION,
+        # Integrity digest of the processed snapshot; the version id
+        # itself is derived from the input/config hashes.
+        "processed_hash": processed_hash,
         "preprocess_stats": {
             "rows_before": int(len(raw_dataframe)),
             "rows_after": int(len(processed_dataframe)),
@@ -125,16 +259,25 @@ def _persist_version(
         raw_archive_dir.mkdir(parents=True, exist_ok=True)
         archived_name = f"{version_hash[:8]}__{source_name}"
         archived_path = raw_archive_dir / archived_name
-        archived_path.write_bytes(input_bytes)
+        # Hardlink to the snapshot already inside version_dir: zero extra
+        # bytes, shared page cache, and the archive cannot drift from the
+        # immutable snapshot. Cross-device setups fall back to a copy.
+        try:
+            os.link(raw_snapshot_path, archived_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            _copy_file(raw_snapshot_path, archived_path)
         metadata["artifacts"]["raw_archive"] = str(archived_path.relative_to(repo.project_root))
 
-    metadata_path.write_text(
-        json.dumps(metadata, ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
+    # metadata.json is machine-read (log index, diff service); compact
+    # encoding halves the bytes written. Human-facing files (config
+    # snapshot, diff reports) stay pretty-printed.
+    metadata_path.write_bytes(_json.dumps_compact(metadata, trailing_newline=True))
 
-    repo.append_log(metadata)
-    repo.set_head(version_hash)
+    with repo.transaction():
+        repo.append_log(metadata)
+        repo.set_head(version_hash)
 
     return {
         "status": "created",
@@ -160,10 +303,27 @@ def create_version_from_paths(
     dataset_file = Path(dataset_path)
     config_file = Path(config_path)
 
-    raw_bytes = dataset_file.read_bytes()
     config = read_config(config_path)
+    config_hash = digest_from_json(config)
+
+    # A fingerprint-cache hit lets the dedupe check run before the file
+    # is even opened.
+    cached_input_hash = repo.get_cached_input_hash(dataset_file)
+    if cached_input_hash is not None:
+        duplicate = _find_existing_version(
+            repo, cached_input_hash, config_hash, str(dataset_file), str(config_file)
+        )
+        if duplicate is not None:
+            return duplicate
+
+    input_hash, raw_dataframe = _hash_and_load_dataset(repo, dataset_file, dataset_path)
+
+    duplicate = _find_existing_version(
+        repo, input_hash, config_hash, str(dataset_file), str(config_file)
+    )
+    if duplicate is not None:
+        return duplicate
 
-    raw_dataframe, _ = load_dataset(dataset_path)
     validate_schema(raw_dataframe)
 
     processed_dataframe = apply_deterministic_preprocessing(raw_dataframe, config)
@@ -171,7 +331,9 @@ def create_version_from_paths(
         repo=repo,
         source_data_path=str(dataset_file),
         source_config_path=str(config_file),
-        input_bytes=raw_bytes,
+        input_file=dataset_file,
+        input_hash=input_hash,
+        config_hash=config_hash,
         raw_dataframe=raw_dataframe,
         processed_dataframe=processed_dataframe,
         config=config,
@@ -198,9 +360,17 @@ def create_version_from_head(
 
     config_file = Path(config_path)
     config = read_config(config_path)
+    config_hash = digest_from_json(config)
+
+    input_hash, cached_dataframe = _load_head_processed(head_version, str(head_processed_path))
 
-    input_bytes = head_processed_path.read_bytes()
-    raw_dataframe = pd.read_csv(head_processed_path)
+    duplicate = _find_existing_version(
+        repo, input_hash, config_hash, f"HEAD:{head_version}", str(config_file)
+    )
+    if duplicate is not None:
+        return duplicate
+
+    raw_dataframe = cached_dataframe.copy()
     validate_schema(raw_dataframe)
     processed_dataframe = apply_deterministic_preprocessing(raw_dataframe, config)
 
@@ -208,7 +378,9 @@ def create_version_from_head(
         repo=repo,
         source_data_path=f"HEAD:{head_version}",
         source_config_path=str(config_file),
-        input_bytes=input_bytes,
+        input_file=head_processed_path,
+        input_hash=input_hash,
+        config_hash=config_hash,
         raw_dataframe=raw_dataframe,
         processed_dataframe=processed_dataframe,
         config=config,
@@ -224,19 +396,37 @@ def create_version_from_raw_default(
     dataset_path = _normalize_user_path(dataset_path)
 
     dataset_file = Path(dataset_path)
-    raw_bytes = dataset_file.read_bytes()
 
-    raw_dataframe, _ = load_dataset(dataset_path)
+    config = get_default_preprocess_config()
+    config_hash = digest_from_json(config)
+
+    cached_input_hash = repo.get_cached_input_hash(dataset_file)
+    if cached_input_hash is not None:
+        duplicate = _find_existing_version(
+            repo, cached_input_hash, config_hash, str(dataset_file), "DEFAULT_CONFIG"
+        )
+        if duplicate is not None:
+            return duplicate
+
+    input_hash, raw_dataframe = _hash_and_load_dataset(repo, dataset_file, dataset_path)
+
+    duplicate = _find_existing_version(
+        repo, input_hash, config_hash, str(dataset_file), "DEFAULT_CONFIG"
+    )
+    if duplicate is not None:
+        return duplicate
+
     validate_schema(raw_dataframe)
 
-    config = get_default_preprocess_config()
     processed_dataframe = apply_deterministic_preprocessing(raw_dataframe, config)
 
     return _persist_version(
         repo=repo,
         source_data_path=str(dataset_file),
         source_config_path="DEFAULT_CONFIG",
-        input_bytes=raw_bytes,
+        input_file=dataset_file,
+        input_hash=input_hash,
+        config_hash=config_hash,
         raw_dataframe=raw_dataframe,
         processed_dataframe=processed_dataframe,
         config=config,
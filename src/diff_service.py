@@ -1,11 +1,14 @@
-import json
+import io
+import mmap
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 
+from src import _json
 from src.errors import DataLineageError
+from src.io_loader import read_csv_fast
 from src.repo import RepoState
 
 
@@ -13,7 +16,17 @@ def _load_processed_dataframe(version_dir: Path) -> pd.DataFrame:
     processed_file = version_dir / "processed.csv"
     if not processed_file.exists():
         raise DataLineageError(f"Processed artifact missing: {processed_file}")
-    return pd.read_csv(processed_file)
+    # Map the snapshot instead of slurping it into a fresh bytes object;
+    # the page cache backs the parse directly.
+    with open(processed_file, "rb") as handle:
+        try:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return read_csv_fast(str(processed_file))
+    try:
+        return read_csv_fast(io.BytesIO(mapping))
+    finally:
+        mapping.close()
 
 
 def _load_metadata(version_dir: Path) -> Dict[str, Any]:
@@ -21,8 +34,8 @@ def _load_metadata(version_dir: Path) -> Dict[str, Any]:
     if not metadata_file.exists():
         raise DataLineageError(f"Metadata artifact missing: {metadata_file}")
     try:
-        return json.loads(metadata_file.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as error:
+        return _json.loads(metadata_file.read_bytes())
+    except ValueError as error:
         raise DataLineageError(f"Invalid metadata JSON: {metadata_file}") from error
 
 
@@ -30,7 +43,28 @@ def _now_utc_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 
-def compare_versions(repo: RepoState, version_a: str, version_b: str) -> Dict[str, Any]:
+def _version_shape(version_dir: Path, metadata: Dict[str, Any], deep: bool) -> Tuple[int, List[str]]:
+    """Return (row_count, column list) for a version.
+
+    The commit path already persists both in metadata.json, so by default
+    no CSV has to be parsed at all. ``deep`` (or metadata written before
+    these fields existed) falls back to reading the processed snapshot.
+    """
+    if not deep:
+        row_count = metadata.get("row_count")
+        columns = metadata.get("preprocess_stats", {}).get("columns_after")
+        if row_count is not None and columns is not None:
+            return int(row_count), [str(column) for column in columns]
+    dataframe = _load_processed_dataframe(version_dir)
+    return int(len(dataframe)), [str(column) for column in dataframe.columns.tolist()]
+
+
+def compare_versions(
+    repo: RepoState,
+    version_a: str,
+    version_b: str,
+    deep: bool = False,
+) -> Dict[str, Any]:
     if not repo.version_exists(version_a):
         raise DataLineageError(f"Version not found: {version_a}")
     if not repo.version_exists(version_b):
@@ -39,14 +73,11 @@ def compare_versions(repo: RepoState, version_a: str, version_b: str) -> Dict[st
     version_a_dir = repo.versions_root / version_a
     version_b_dir = repo.versions_root / version_b
 
-    dataframe_a = _load_processed_dataframe(version_a_dir)
-    dataframe_b = _load_processed_dataframe(version_b_dir)
-
     metadata_a = _load_metadata(version_a_dir)
     metadata_b = _load_metadata(version_b_dir)
 
-    columns_a = [str(column) for column in dataframe_a.columns.tolist()]
-    columns_b = [str(column) for column in dataframe_b.columns.tolist()]
+    row_count_a, columns_a = _version_shape(version_a_dir, metadata_a, deep)
+    row_count_b, columns_b = _version_shape(version_b_dir, metadata_b, deep)
 
     label_dist_a = metadata_a.get("label_distribution", {})
     label_dist_b = metadata_b.get("label_distribution", {})
@@ -54,22 +85,25 @@ def compare_versions(repo: RepoState, version_a: str, version_b: str) -> Dict[st
     config_hash_a = metadata_a.get("config_hash")
     config_hash_b = metadata_b.get("config_hash")
 
+    column_set_a = set(columns_a)
+    column_set_b = set(columns_b)
+
     diff_report: Dict[str, Any] = {
         "generated_at": _now_utc_iso(),
         "version_a": version_a,
         "version_b": version_b,
         "summary": {
-            "row_count_a": int(len(dataframe_a)),
-            "row_count_b": int(len(dataframe_b)),
-            "row_delta": int(len(dataframe_b) - len(dataframe_a)),
+            "row_count_a": row_count_a,
+            "row_count_b": row_count_b,
+            "row_delta": row_count_b - row_count_a,
             "column_count_a": int(len(columns_a)),
             "column_count_b": int(len(columns_b)),
             "config_changed": bool(config_hash_a != config_hash_b),
         },
         "columns": {
-            "only_in_a": sorted(list(set(columns_a) - set(columns_b))),
-            "only_in_b": sorted(list(set(columns_b) - set(columns_a))),
-            "common": sorted(list(set(columns_a).intersection(set(columns_b)))),
+            "only_in_a": sorted(column_set_a - column_set_b),
+            "only_in_b": sorted(column_set_b - column_set_a),
+            "common": sorted(column_set_a & column_set_b),
         },
         "label_distribution": {
             "a": label_dist_a,
@@ -90,17 +124,14 @@ def compare_versions(repo: RepoState, version_a: str, version_b: str) -> Dict[st
     reports_dir.mkdir(parents=True, exist_ok=True)
 
     report_file = reports_dir / f"diff_{version_a[:8]}__{version_b[:8]}.json"
-    report_file.write_text(
-        json.dumps(diff_report, ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
+    report_file.write_bytes(_json.dumps_pretty(diff_report, trailing_newline=True))
 
     return {
         "version_a": version_a,
         "version_b": version_b,
-        "row_count_a": int(len(dataframe_a)),
-        "row_count_b": int(len(dataframe_b)),
-        "row_delta": int(len(dataframe_b) - len(dataframe_a)),
+        "row_count_a": row_count_a,
+        "row_count_b": row_count_b,
+        "row_delta": row_count_b - row_count_a,
         "config_changed": bool(config_hash_a != config_hash_b),
         "label_distribution_changed": bool(label_dist_a != label_dist_b),
         "report_path": str(report_file),
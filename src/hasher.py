@@ -1,24 +1,129 @@
 import hashlib
-import json
 from typing import Dict
 
 import pandas as pd
 
+from src import _json
+
+try:
+    from blake3 import blake3
+except ImportError:  # optional dependency
+    blake3 = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional dependency
+    pa = None
+    pacsv = None
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Hashes are purely internal identifiers (directory names + dedupe keys),
+# so the algorithm can change as long as stores record which one produced
+# their ids. BLAKE3 hashes large payloads several times faster than
+# SHA-256 thanks to its vectorized, parallel tree structure.
+if blake3 is not None:
+    HASH_ALGORITHM = "blake3"
+    HASH_VERSION = 2
+
+    def _new_digest():
+        return blake3(max_threads=blake3.AUTO)
+
+else:
+    HASH_ALGORITHM = "sha256"
+    HASH_VERSION = 1
+
+    def _new_digest():
+        return hashlib.sha256()
+
 
 def dataframe_to_stable_csv_bytes(dataframe: pd.DataFrame) -> bytes:
     csv_text = dataframe.to_csv(index=False, lineterminator="\n")
     return csv_text.encode("utf-8")
 
 
-def sha256_from_bytes(payload: bytes) -> str:
-    return hashlib.sha256(payload).hexdigest()
+class _HashingWriter:
+    """File-like tee that hashes every chunk it forwards to a binary file."""
+
+    def __init__(self, file_obj) -> None:
+        self._file = file_obj
+        self._digest = _new_digest()
+        self.closed = False
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        # The underlying handle is owned by the caller's ``with`` block.
+        self.flush()
+        self.closed = True
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def _arrow_table_from_dataframe(dataframe: pd.DataFrame):
+    """Convert to an Arrow table for the fast CSV writer, or None."""
+    if pa is None:
+        return None
+    try:
+        return pa.Table.from_pandas(dataframe, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns and the like; the pandas writer
+        # handles anything, so just let it.
+        return None
+
+
+def stream_dataframe_to_stable_csv(dataframe: pd.DataFrame, destination) -> str:
+    """Write the stable CSV form of ``dataframe`` to ``destination``.
+
+    The CSV is streamed chunk-by-chunk into the file and the hash at the
+    same time, so the full payload is never materialized in memory.
+    When pyarrow is available its multithreaded C++ CSV writer is used;
+    either writer produces deterministic bytes, and the hex digest of
+    whatever was written is returned.
+    """
+    table = _arrow_table_from_dataframe(dataframe)
+    with open(destination, "wb", buffering=_HASH_CHUNK_SIZE) as handle:
+        writer = _HashingWriter(handle)
+        if table is not None:
+            sink = pa.PythonFile(writer, mode="w")
+            pacsv.write_csv(
+                table,
+                sink,
+                write_options=pacsv.WriteOptions(include_header=True),
+            )
+            sink.close()
+        else:
+            dataframe.to_csv(writer, index=False, lineterminator="\n")
+        return writer.hexdigest()
+
+
+def digest_from_bytes(payload: bytes) -> str:
+    digest = _new_digest()
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def digest_from_buffer(buffer) -> str:
+    digest = _new_digest()
+    view = memoryview(buffer)
+    for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+        digest.update(view[offset : offset + _HASH_CHUNK_SIZE])
+    return digest.hexdigest()
 
 
-def sha256_from_json(data: Dict) -> str:
-    canonical_json = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
-    return sha256_from_bytes(canonical_json.encode("utf-8"))
+def digest_from_json(data: Dict) -> str:
+    return digest_from_bytes(_json.dumps_canonical(data))
 
 
-def build_version_hash(input_hash: str, config_hash: str) -> str:
-    combined = f"{input_hash}:{config_hash}".encode("utf-8")
-    return sha256_from_bytes(combined)
+def build_version_hash(input_hash: str, config_hash: str, preprocess_version: str) -> str:
+    combined = f"{input_hash}:{config_hash}:{preprocess_version}".encode("utf-8")
+    return digest_from_bytes(combined)
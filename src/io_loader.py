@@ -1,12 +1,31 @@
+import io
 import json
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
+try:
+    import pyarrow.csv as pacsv
+except ImportError:  # optional dependency
+    pacsv = None
+
 from src.errors import ValidationError
 
 
+def read_csv_fast(source) -> pd.DataFrame:
+    """Parse CSV from a path or file-like object.
+
+    Uses pyarrow's multithreaded C++ reader when installed; otherwise
+    falls back to pandas' single-threaded parser.
+    """
+    if pacsv is not None:
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+        table = pacsv.read_csv(source, read_options=read_options)
+        return table.to_pandas()
+    return pd.read_csv(source)
+
+
 def read_config(config_path: str) -> Dict:
     path = Path(config_path)
     if not path.exists() or not path.is_file():
@@ -21,19 +40,25 @@ def read_config(config_path: str) -> Dict:
         raise ValidationError(f"Invalid JSON config: {error}") from error
 
 
-def load_dataset(dataset_path: str) -> Tuple[pd.DataFrame, str]:
+def load_dataset(dataset_path: str, buffer: Optional[bytes] = None) -> Tuple[pd.DataFrame, str]:
     path = Path(dataset_path)
     if not path.exists() or not path.is_file():
         raise ValidationError(f"Dataset file not found: {dataset_path}")
 
+    # When the caller already holds the file contents (e.g. an mmap used for
+    # hashing), parse from that buffer instead of re-reading the file.
+    source = io.BytesIO(buffer) if buffer is not None else path
+
     suffix = path.suffix.lower()
     if suffix == ".csv":
-        dataframe = pd.read_csv(path)
+        dataframe = read_csv_fast(source)
     elif suffix == ".json":
         try:
-            dataframe = pd.read_json(path)
+            dataframe = pd.read_json(source)
         except ValueError:
-            dataframe = pd.read_json(path, lines=True)
+            if buffer is not None:
+                source = io.BytesIO(buffer)
+            dataframe = pd.read_json(source, lines=True)
     else:
         raise ValidationError("Only CSV and JSON input are supported in this prototype.")
 
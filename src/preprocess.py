@@ -1,9 +1,44 @@
 import re
-import unicodedata
+from functools import lru_cache
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional dependency
+    pa = None
+    pc = None
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+try:
+    import polars as pl
+except ImportError:  # optional dependency
+    pl = None
+
+# Version ids derive from (input_hash, config_hash, PREPROCESS_VERSION).
+# Bump this whenever the pipeline's output semantics change, so new runs
+# are never deduped against output of the old pipeline.
+# 2: default row ordering switched to the hash-keyed sort.
+# 3: numeric coercion decides from a 256-value sample; later
+#    non-numeric stragglers coerce to NaN instead of vetoing the column.
+PREPROCESS_VERSION = "3"
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+")
+PUNCT_RE = re.compile(r"[^a-z0-9\s]")
+WS_RE = re.compile(r"\s+")
+# Punctuation removal followed by whitespace collapsing is equivalent to
+# replacing every run of non-alphanumerics (whitespace included) with a
+# single space, so the default path does both in one pass.
+PUNCT_WS_RE = re.compile(r"[^a-z0-9]+")
+NUMERIC_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
 
 def get_default_preprocess_config() -> Dict:
     return {
@@ -20,51 +55,184 @@ def get_default_preprocess_config() -> Dict:
         "null_strategy": "drop_any",  # drop_any | drop_all | fill | keep
         "null_fill_text": "",
         "null_fill_numeric": 0,
-        "sort_rows": True,
+        "sort_rows": True,  # True (hash order) | "full" (lexicographic) | False
     }
 
 
 def _normalize_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
-    dataframe = dataframe.copy()
     dataframe.columns = [str(column).strip().lower() for column in dataframe.columns]
     return dataframe
 
 
-def _cleanup_text(value: str) -> str:
-    text = str(value)
-    text = unicodedata.normalize("NFKC", text)
-    text = text.strip().lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+def _cast_text_columns_to_arrow(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Move object text columns onto Arrow-backed string storage.
+
+    Bytes-packed Arrow buffers use a fraction of the memory of Python
+    object arrays and let the supported ``.str`` operations dispatch to
+    C++ kernels. Columns Arrow cannot hold stay as they are.
+    """
+    if pa is None:
+        return dataframe
+    object_columns = dataframe.select_dtypes(include=["object"]).columns
+    for column in object_columns:
+        try:
+            dataframe[column] = dataframe[column].astype("string[pyarrow]")
+        except (TypeError, ValueError):
+            continue
+    return dataframe
+
+
+def _cleanup_flags(config: Dict) -> tuple:
+    return (
+        bool(config.get("normalize_unicode", True)),
+        bool(config.get("strip_text", True)),
+        bool(config.get("remove_urls", False)),
+        bool(config.get("lowercase_text", True)),
+        bool(config.get("remove_punctuation", True)),
+        bool(config.get("collapse_spaces", True)),
+    )
+
+
+@lru_cache(maxsize=8)
+def _compile_cleanup(
+    normalize_unicode: bool,
+    strip_text: bool,
+    remove_urls: bool,
+    lowercase_text: bool,
+    remove_punctuation: bool,
+    collapse_spaces: bool,
+):
+    """Partially evaluate the config into a fixed list of cleanup steps.
+
+    The flags are constant across a preprocessing run, so they are
+    resolved once here instead of being re-branched for every column.
+    The compiled pipelines are cached per flag combination.
+    """
+    steps = []
+    if normalize_unicode:
+        steps.append(lambda s: s.str.normalize("NFKC"))
+    if strip_text:
+        steps.append(lambda s: s.str.strip())
+    if remove_urls:
+        steps.append(lambda s: s.str.replace(URL_RE, " ", regex=True))
+    if lowercase_text:
+        steps.append(lambda s: s.str.lower())
+    if remove_punctuation and collapse_spaces:
+        steps.append(lambda s: s.str.replace(PUNCT_WS_RE, " ", regex=True))
+    elif remove_punctuation:
+        steps.append(lambda s: s.str.replace(PUNCT_RE, " ", regex=True))
+    elif collapse_spaces:
+        steps.append(lambda s: s.str.replace(WS_RE, " ", regex=True))
+    steps.append(lambda s: s.str.strip())
+
+    def run(series: pd.Series) -> pd.Series:
+        for step in steps:
+            series = step(series)
+        return series
+
+    return run
+
+
+def _vectorized_cleanup(series: pd.Series, config: Dict) -> pd.Series:
+    """Config-driven text cleanup as a chain of ``Series.str`` operations.
+
+    ``.str`` accessors skip NA natively and iterate in C, so there is no
+    per-cell Python dispatch and no explicit isna guard. The leading
+    ``astype("string")`` stringifies non-text cells while keeping nulls
+    null; a trailing strip always runs, as the scalar cleanup always did.
+    """
+    return _compile_cleanup(*_cleanup_flags(config))(series.astype("string"))
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _clean_ascii_kernel(buf):  # pragma: no cover - compiled
+        """Lowercase, punct-to-space, and space-collapse in one byte pass."""
+        out = np.empty(len(buf), dtype=np.uint8)
+        length = 0
+        prev_space = True  # swallows leading spaces
+        for i in range(len(buf)):
+            byte = buf[i]
+            if 65 <= byte <= 90:
+                byte += 32
+            if not (97 <= byte <= 122 or 48 <= byte <= 57):
+                byte = 32
+            if byte == 32:
+                if prev_space:
+                    continue
+                prev_space = True
+            else:
+                prev_space = False
+            out[length] = byte
+            length += 1
+        if length and out[length - 1] == 32:
+            length -= 1
+        return out[:length]
+
+
+# Maps every ASCII char outside [a-z0-9] and whitespace to a space; a
+# C-level table lookup per char, no regex engine involved.
+_PUNCT_TABLE = str.maketrans(
+    {
+        chr(code): " "
+        for code in range(128)
+        if chr(code) not in "abcdefghijklmnopqrstuvwxyz0123456789 \t\n\r\v\f"
+    }
+)
+
+
+def _ascii_fast_path_applies(config: Dict) -> bool:
+    """The ASCII fast paths hardcode the default cleanup flags."""
+    return (
+        not bool(config.get("remove_urls", False))
+        and bool(config.get("lowercase_text", True))
+        and bool(config.get("remove_punctuation", True))
+        and bool(config.get("collapse_spaces", True))
+    )
 
 
-def _cleanup_text_with_config(value: str, config: Dict) -> str:
-    text = str(value)
+def _clean_ascii_text(value: str) -> str:
+    if numba is not None:
+        data = np.frombuffer(value.encode("ascii"), dtype=np.uint8)
+        return _clean_ascii_kernel(data).tobytes().decode("ascii")
+    # translate does punctuation-to-space in one table pass; split/join
+    # collapses and strips the whitespace runs.
+    return " ".join(value.lower().translate(_PUNCT_TABLE).split())
 
-    if bool(config.get("normalize_unicode", True)):
-        text = unicodedata.normalize("NFKC", text)
 
-    if bool(config.get("strip_text", True)):
-        text = text.strip()
+# Below this row count the dictionary detour costs more than it saves.
+_UNIQUE_MAP_MIN_ROWS = 1024
 
-    if bool(config.get("remove_urls", False)):
-        text = re.sub(r"https?://\S+|www\.\S+", " ", text)
 
-    if bool(config.get("lowercase_text", True)):
-        text = text.lower()
+def _cleanup_with_unique_mapping(series: pd.Series, config: Dict) -> pd.Series:
+    """Clean each distinct value once, then map the results back.
 
-    if bool(config.get("remove_punctuation", True)):
-        text = re.sub(r"[^a-z0-9\s]", " ", text)
+    For low-cardinality columns this turns an O(rows) string pipeline
+    into O(unique values) plus one hash lookup per row. A plain dict map
+    is used rather than categorical rename_categories, which rejects
+    duplicate cleaned values.
+    """
+    uniques = series.dropna().unique()
+    values = [str(value) for value in uniques]
+    if _ascii_fast_path_applies(config) and all(value.isascii() for value in values):
+        mapping = dict(zip(uniques, (_clean_ascii_text(value) for value in values)))
+    else:
+        cleaned = _vectorized_cleanup(pd.Series(list(uniques)), config)
+        mapping = dict(zip(uniques, cleaned))
+    return series.map(mapping).astype("string")
 
-    if bool(config.get("collapse_spaces", True)):
-        text = re.sub(r"\s+", " ", text)
 
-    return text.strip()
+def _cleanup_column(series: pd.Series, config: Dict) -> pd.Series:
+    if len(series) >= _UNIQUE_MAP_MIN_ROWS:
+        unique_count = series.nunique(dropna=True)
+        if unique_count * 2 <= len(series):
+            return _cleanup_with_unique_mapping(series, config)
+    return _vectorized_cleanup(series, config)
 
 
 def _normalize_unwanted_values(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
-    processed = dataframe.copy()
+    processed = dataframe
     unwanted_values = config.get(
         "unwanted_values",
         ["", "na", "n/a", "null", "none", "-", "?"],
@@ -72,41 +240,149 @@ def _normalize_unwanted_values(dataframe: pd.DataFrame, config: Dict) -> pd.Data
     unwanted_lookup = {str(item).strip().lower() for item in unwanted_values}
 
     object_columns = processed.select_dtypes(include=["object", "string"]).columns
+    value_set = None
+    if pc is not None and len(object_columns):
+        value_set = pa.array(sorted(unwanted_lookup), type=pa.string())
+
     for column in object_columns:
-        normalized = processed[column].astype(str).str.strip().str.lower()
-        processed.loc[normalized.isin(unwanted_lookup), column] = pd.NA
+        mask = None
+        if value_set is not None:
+            # One fused trim+lower+is_in pass through Arrow's C++
+            # kernels instead of three allocating pandas .str passes.
+            try:
+                values = pa.array(processed[column], type=pa.string())
+                normalized = pc.utf8_lower(pc.utf8_trim_whitespace(values))
+                mask = pc.fill_null(
+                    pc.is_in(normalized, value_set=value_set), False
+                ).to_numpy(zero_copy_only=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                mask = None
+        if mask is None:
+            normalized = processed[column].astype(str).str.strip().str.lower()
+            mask = normalized.isin(unwanted_lookup)
+        processed.loc[mask, column] = pd.NA
 
     return processed
 
 
+def _ascii_numeric_candidate(values: list) -> bool:
+    """Cheap vectorized pre-filter: could these strings all be numeric?
+
+    Joins the values and checks every byte against the numeric alphabet
+    (digits, sign, decimal point, thousands comma, whitespace) as one
+    NumPy reduction over a flat buffer. A single foreign byte rules the
+    column out without ever starting the regex engine; structure (sign
+    placement, one decimal point) is still confirmed per value after.
+    """
+    try:
+        data = "\n".join(values).encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    mask = (
+        ((buffer >= 0x30) & (buffer <= 0x39))
+        | (buffer == 0x2E)
+        | (buffer == 0x2D)
+        | (buffer == 0x2C)
+        | (buffer == 0x20)
+        | ((buffer >= 0x09) & (buffer <= 0x0D))
+    )
+    return bool(mask.all())
+
+
+# Values inspected when deciding whether a column is numeric. Stragglers
+# past the sample coerce to NaN rather than vetoing the whole column.
+_NUMERIC_SAMPLE_SIZE = 256
+
+
 def _looks_like_numeric_series(series: pd.Series) -> bool:
     non_null = series.dropna()
     if non_null.empty:
         return False
 
-    normalized = non_null.astype(str).str.replace(",", "", regex=False).str.strip()
-    numeric_pattern = r"^-?\d+(\.\d+)?$"
-    return bool(normalized.str.match(numeric_pattern).all())
+    values = [str(value) for value in non_null.head(_NUMERIC_SAMPLE_SIZE)]
+    if not _ascii_numeric_candidate(values):
+        return False
+
+    # Short-circuiting scan: one compiled fullmatch per value, stopping
+    # at the first non-numeric cell instead of three full .str passes
+    # plus a non-lazy .all() reduction.
+    return all(
+        NUMERIC_RE.fullmatch(value.replace(",", "").strip()) is not None
+        for value in values
+    )
 
 
 def _coerce_numeric_like_columns(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
     if not bool(config.get("coerce_numeric_columns", True)):
         return dataframe
 
-    processed = dataframe.copy()
+    processed = dataframe
     object_columns = processed.select_dtypes(include=["object", "string"]).columns
     for column in object_columns:
         if _looks_like_numeric_series(processed[column]):
+            values = processed[column]
+            if values.dtype == object:
+                values = values.astype(str)
             processed[column] = pd.to_numeric(
-                processed[column].astype(str).str.replace(",", "", regex=False),
+                values.str.replace(",", "", regex=False),
                 errors="coerce",
             )
 
     return processed
 
 
+def _polars_text_stage(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
+    """Unwanted-value nulling plus text cleanup as one lazy polars plan.
+
+    Polars fuses the chained string expressions and runs all columns on
+    multiple cores, replacing the per-column pandas passes. The rest of
+    the pipeline continues on the returned pandas frame, so output is
+    identical to the pandas engine.
+    """
+    lazy_frame = pl.from_pandas(dataframe).lazy()
+    schema = lazy_frame.collect_schema()
+    text_columns = [name for name, dtype in schema.items() if dtype == pl.String]
+    if not text_columns:
+        return dataframe
+
+    unwanted_values = config.get(
+        "unwanted_values",
+        ["", "na", "n/a", "null", "none", "-", "?"],
+    )
+    unwanted_lookup = sorted({str(item).strip().lower() for item in unwanted_values})
+    cleanup_text = bool(config.get("cleanup_text", True))
+    remove_punctuation = bool(config.get("remove_punctuation", True))
+    collapse_spaces = bool(config.get("collapse_spaces", True))
+
+    expressions = []
+    for name in text_columns:
+        column = pl.col(name)
+        normalized = column.str.strip_chars().str.to_lowercase()
+        column = pl.when(normalized.is_in(unwanted_lookup)).then(None).otherwise(column)
+        if cleanup_text:
+            if bool(config.get("normalize_unicode", True)):
+                column = column.str.normalize("NFKC")
+            if bool(config.get("strip_text", True)):
+                column = column.str.strip_chars()
+            if bool(config.get("remove_urls", False)):
+                column = column.str.replace_all(URL_RE.pattern, " ")
+            if bool(config.get("lowercase_text", True)):
+                column = column.str.to_lowercase()
+            if remove_punctuation and collapse_spaces:
+                column = column.str.replace_all(PUNCT_WS_RE.pattern, " ")
+            elif remove_punctuation:
+                column = column.str.replace_all(PUNCT_RE.pattern, " ")
+            elif collapse_spaces:
+                column = column.str.replace_all(WS_RE.pattern, " ")
+            column = column.str.strip_chars()
+        expressions.append(column.alias(name))
+
+    return lazy_frame.with_columns(expressions).collect().to_pandas()
+
+
 def _apply_null_strategy(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
-    processed = dataframe.copy()
+    processed = dataframe
 
     strategy = str(config.get("null_strategy", "drop_any")).strip().lower()
     if not strategy:
@@ -125,58 +401,95 @@ def _apply_null_strategy(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
         text_fill_value = config.get("null_fill_text", "")
         numeric_fill_value = config.get("null_fill_numeric", 0)
 
-        object_columns = processed.select_dtypes(include=["object", "string"]).columns
-        numeric_columns = processed.select_dtypes(include=["number", "boolean"]).columns
-
-        if len(object_columns) > 0:
-            processed[object_columns] = processed[object_columns].fillna(text_fill_value)
-
-        if len(numeric_columns) > 0:
-            processed[numeric_columns] = processed[numeric_columns].fillna(numeric_fill_value)
-
-        remaining_columns = [
-            column
-            for column in processed.columns
-            if column not in set(object_columns).union(set(numeric_columns))
-        ]
-        if remaining_columns:
-            processed[remaining_columns] = processed[remaining_columns].fillna(text_fill_value)
+        # Resolve each column's fill value up front and fill in one
+        # pass, instead of three dtype-sliced assignments plus a Python
+        # set union to find the leftovers.
+        fill_map = {
+            column: (
+                numeric_fill_value
+                if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+                else text_fill_value
+            )
+            for column, dtype in processed.dtypes.items()
+        }
+        if fill_map:
+            processed = processed.fillna(value=fill_map)
 
         return processed
 
     return processed
 
 
-def apply_deterministic_preprocessing(dataframe: pd.DataFrame, config: Dict) -> pd.DataFrame:
+def apply_deterministic_preprocessing(
+    dataframe: pd.DataFrame,
+    config: Dict,
+    engine: str = "pandas",
+) -> pd.DataFrame:
     merged_config = {**get_default_preprocess_config(), **(config or {})}
 
-    processed = _normalize_columns(dataframe)
+    # The helpers mutate in place; this one copy at the pipeline entry
+    # shields the caller's frame instead of each stage re-materializing.
+    processed = dataframe.copy()
+
+    processed = _normalize_columns(processed)
+    processed = _cast_text_columns_to_arrow(processed)
 
-    processed = _normalize_unwanted_values(processed, merged_config)
+    text_stage_done = False
+    if engine == "polars" and pl is not None:
+        try:
+            processed = _polars_text_stage(processed, merged_config)
+            text_stage_done = True
+        except (pl.exceptions.PolarsError, TypeError, ValueError):
+            # Frames polars cannot represent fall back to pandas below.
+            pass
 
-    object_columns = processed.select_dtypes(include=["object", "string"]).columns
-    for column in object_columns:
+    if not text_stage_done:
+        processed = _normalize_unwanted_values(processed, merged_config)
         if bool(merged_config.get("cleanup_text", True)):
-            processed[column] = processed[column].map(
-                lambda value: value
-                if pd.isna(value)
-                else _cleanup_text_with_config(str(value), merged_config)
-            )
+            object_columns = processed.select_dtypes(include=["object", "string"]).columns
+            for column in object_columns:
+                processed[column] = _cleanup_column(processed[column], merged_config)
 
     processed = _coerce_numeric_like_columns(processed, merged_config)
     processed = _apply_null_strategy(processed, merged_config)
 
-    if bool(merged_config.get("drop_duplicates", True)):
-        processed = processed.drop_duplicates(keep="first")
-
-    if bool(merged_config.get("sort_rows", True)):
-        sort_columns = list(processed.columns)
-        if sort_columns:
-            processed = processed.sort_values(
-                by=sort_columns,
-                kind="mergesort",
-                na_position="last",
-            )
+    drop_duplicates = bool(merged_config.get("drop_duplicates", True))
+    sort_rows = merged_config.get("sort_rows", True)
+    full_sort = bool(sort_rows) and str(sort_rows).strip().lower() == "full"
+    hash_sort = bool(sort_rows) and not full_sort and len(processed.columns) > 0
+
+    # One uint64 row-hash pass feeds both deduplication and the sort.
+    row_hashes = None
+    if (drop_duplicates or hash_sort) and len(processed.columns):
+        row_hashes = pd.util.hash_pandas_object(processed, index=False)
+
+    if drop_duplicates and row_hashes is not None:
+        # Hash-table dedupe on the uint64 keys, then an exact check on
+        # just the flagged rows so a hash collision can never drop a
+        # genuinely distinct row. Exact duplicates always collide, so
+        # every duplicate group lives inside the flagged subset.
+        flagged = row_hashes.duplicated(keep=False)
+        if flagged.any():
+            exact_duplicates = processed.loc[flagged].duplicated(keep="first")
+            drop_index = exact_duplicates.index[exact_duplicates]
+            if len(drop_index):
+                processed = processed.drop(index=drop_index)
+                row_hashes = row_hashes.drop(index=drop_index)
+
+    if hash_sort:
+        # The sort only exists for determinism, so any stable,
+        # reproducible key will do: the row hash replaces multi-key
+        # object comparisons.
+        order = np.argsort(row_hashes.to_numpy(), kind="stable")
+        processed = processed.take(order)
+    elif full_sort and len(processed.columns):
+        # Legacy ordering: lexicographic over every column, which
+        # compares string objects pairwise across all keys.
+        processed = processed.sort_values(
+            by=list(processed.columns),
+            kind="mergesort",
+            na_position="last",
+        )
     processed = processed.reset_index(drop=True)
 
     return processed
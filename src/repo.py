@@ -1,8 +1,15 @@
-import json
+import atexit
+import mmap
+import os
+import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from src import _json
 from src.errors import RepositoryNotInitializedError
+from src.hasher import HASH_ALGORITHM
+from src.repo_db import LogIndex
 
 
 class RepoState:
@@ -11,50 +18,352 @@ class RepoState:
         self.repo_root = self.project_root / ".mydata"
         self.versions_root = self.repo_root / "versions"
         self.head_file = self.repo_root / "HEAD"
-        self.logs_file = self.repo_root / "logs.json"
+        self.logs_file = self.repo_root / "logs.jsonl"
+        self.legacy_logs_file = self.repo_root / "logs.json"
         self.meta_file = self.repo_root / "repo_meta.json"
+        self.input_hash_cache_file = self.repo_root / "input_hash_cache.json"
+        self._logs_cache: List[Dict[str, Any]] = []
+        self._logs_cache_key: Optional[Tuple[int, int]] = None
+        self._head_cache: Optional[Tuple[Optional[str], Tuple[int, int]]] = None
+        self._by_version_id: Dict[str, Dict[str, Any]] = {}
+        self.index_db_file = self.repo_root / "index.db"
+        self._input_hash_cache: Optional[Dict[str, str]] = None
+        self._txn_buffer: Optional[List[Dict[str, Any]]] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_threshold = 32
+        self._log_index: Optional[LogIndex] = None
+        self._log_index_failed = False
         self._ensure_initialized()
+        atexit.register(self.flush)
 
     def _ensure_initialized(self) -> None:
-        required_paths = [
-            self.repo_root,
-            self.versions_root,
-            self.head_file,
-            self.logs_file,
-            self.meta_file,
-        ]
-        if not all(path.exists() for path in required_paths):
+        # One listdir instead of a stat per required path; this runs on
+        # every RepoState construction.
+        try:
+            entries = set(os.listdir(self.repo_root))
+        except OSError:
+            raise RepositoryNotInitializedError(
+                f"Repository not initialized under: {self.repo_root}"
+            )
+        has_logs = self.logs_file.name in entries or self.legacy_logs_file.name in entries
+        required = {self.versions_root.name, self.head_file.name, self.meta_file.name}
+        if not has_logs or not required.issubset(entries):
             raise RepositoryNotInitializedError(
                 f"Repository not initialized under: {self.repo_root}"
             )
 
-    def get_head(self) -> Optional[str]:
-        raw_value = self.head_file.read_text(encoding="utf-8").strip()
-        if raw_value in {"", "null", "None"}:
+    def _head_stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.head_file)
+        except OSError:
             return None
-        return raw_value
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get_head(self) -> Optional[str]:
+        cache_key = self._head_stat_key()
+        if (
+            self._head_cache is not None
+            and cache_key is not None
+            and self._head_cache[1] == cache_key
+        ):
+            return self._head_cache[0]
+        # HEAD holds at most a hex digest and a newline; one os.read
+        # grabs it without pathlib's open/stat/decode layering.
+        fd = os.open(self.head_file, os.O_RDONLY)
+        try:
+            raw_value = os.read(fd, 128).strip().decode("utf-8")
+        finally:
+            os.close(fd)
+        head = None if raw_value in {"", "null", "None"} else raw_value
+        if cache_key is not None:
+            self._head_cache = (head, cache_key)
+        return head
 
     def set_head(self, version_id: str) -> None:
         self.head_file.write_text(f"{version_id}\n", encoding="utf-8")
+        cache_key = self._head_stat_key()
+        self._head_cache = None if cache_key is None else (version_id, cache_key)
 
-    def read_logs(self) -> List[Dict[str, Any]]:
+    def _logs_path(self) -> Path:
+        """The file logs are currently read from, legacy name included."""
+        if self.logs_file.exists() or not self.legacy_logs_file.exists():
+            return self.logs_file
+        return self.legacy_logs_file
+
+    def _logs_stat_key(self) -> Optional[Tuple[int, int]]:
         try:
-            content = self.logs_file.read_text(encoding="utf-8").strip()
-            if not content:
-                return []
-            data = json.loads(content)
-            if not isinstance(data, list):
+            stat = os.stat(self._logs_path())
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _encode_log_line(record: Dict[str, Any]) -> bytes:
+        return _json.dumps_compact(record, trailing_newline=True)
+
+    def _logs_file_is_legacy(self) -> bool:
+        """True while the logs file still holds the old pretty JSON array."""
+        try:
+            with open(self._logs_path(), "rb") as handle:
+                head = handle.read(64).lstrip()
+        except OSError:
+            return False
+        return head.startswith(b"[")
+
+    def _needs_migration(self) -> bool:
+        """True when a write must first move logs to JSONL under logs.jsonl."""
+        if self._logs_file_is_legacy():
+            return True
+        return not self.logs_file.exists() and self.legacy_logs_file.exists()
+
+    def _migrate_legacy_logs(self) -> None:
+        records = self._parse_logs()
+        with open(self.logs_file, "wb") as handle:
+            for record in records:
+                handle.write(self._encode_log_line(record))
+        if self.legacy_logs_file.exists():
+            self.legacy_logs_file.unlink()
+
+    def _parse_logs(self) -> List[Dict[str, Any]]:
+        if self._logs_file_is_legacy():
+            try:
+                data = _json.loads(self._logs_path().read_bytes())
+                return data if isinstance(data, list) else []
+            except (OSError, ValueError):
                 return []
-            return data
-        except json.JSONDecodeError:
+
+        records: List[Dict[str, Any]] = []
+        try:
+            with open(self._logs_path(), "rb") as handle:
+                # Map the file instead of decoding it into one big str;
+                # lines parse straight off the page cache and the codec
+                # takes bytes anyway.
+                try:
+                    mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # empty log
+                    return []
+                with mapping:
+                    for line in iter(mapping.readline, b""):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            records.append(_json.loads(line))
+                        except ValueError:
+                            continue
+        except OSError:
             return []
+        return records
+
+    def _index_record(self, record: Dict[str, Any]) -> None:
+        if record.get("event_type", "commit") == "commit" and record.get("version_id"):
+            self._by_version_id[str(record["version_id"])] = record
+
+    def read_logs(self) -> List[Dict[str, Any]]:
+        cache_key = self._logs_stat_key()
+        if cache_key is not None and cache_key == self._logs_cache_key:
+            if self._pending:
+                return self._logs_cache + self._pending
+            return self._logs_cache
+
+        logs = self._parse_logs()
+        self._logs_cache = logs
+        self._logs_cache_key = cache_key
+        self._by_version_id = {}
+        for record in logs:
+            self._index_record(record)
+        for record in self._pending:
+            self._index_record(record)
+        if self._pending:
+            return logs + self._pending
+        return logs
 
     def append_log(self, record: Dict[str, Any]) -> None:
-        logs = self.read_logs()
-        logs.append(record)
-        self.logs_file.write_text(
-            json.dumps(logs, ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
+        if self._txn_buffer is not None:
+            self._txn_buffer.append(record)
+            return
+        self._pending.append(record)
+        self._index_record(record)
+        if len(self._pending) >= self._pending_threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered appends through to the log in one batch."""
+        self._flush_records([])
+
+    @contextmanager
+    def transaction(self):
+        """Buffer log appends and write them durably in one batch.
+
+        Records appended inside the block hit the disk with a single
+        write + fsync when the block exits cleanly; on error nothing is
+        written, so half-finished operations leave no log entries.
+        """
+        if self._txn_buffer is not None:
+            # Nested use: the outermost transaction owns the flush.
+            yield self
+            return
+        self._txn_buffer = []
+        try:
+            yield self
+        finally:
+            pending, self._txn_buffer = self._txn_buffer, None
+        self._flush_records(pending)
+
+    def _flush_records(self, records: List[Dict[str, Any]]) -> None:
+        # Drain buffered plain appends ahead of the batch so the on-disk
+        # order always matches append order.
+        if self._pending:
+            records = self._pending + records
+            self._pending = []
+        if not records:
+            return
+        # Refresh the cache from disk if it is stale; with _pending
+        # drained this returns (and fills) self._logs_cache itself, so
+        # extending it below updates the real cached view.
+        self.read_logs()
+        if self._needs_migration():
+            self._migrate_legacy_logs()
+        with open(self.logs_file, "ab") as handle:
+            handle.write(b"".join(self._encode_log_line(record) for record in records))
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._logs_cache.extend(records)
+        self._logs_cache_key = self._logs_stat_key()
+        for record in records:
+            self._store_record(record)
+
+    def _index_handle(self) -> Optional[LogIndex]:
+        """Open the sqlite index lazily; the repo works without it."""
+        if self._log_index_failed:
+            return None
+        if self._log_index is None:
+            try:
+                self._log_index = LogIndex(self.index_db_file)
+            except sqlite3.Error:
+                self._log_index_failed = True
+                return None
+        return self._log_index
+
+    def _store_record(self, record: Dict[str, Any]) -> None:
+        """Index a newly appended record in memory and in sqlite."""
+        self._index_record(record)
+        if record.get("event_type", "commit") != "commit" or not record.get("version_id"):
+            return
+        index = self._index_handle()
+        if index is not None:
+            try:
+                index.insert(record)
+            except sqlite3.Error:
+                pass
+
+    def iter_logs(self) -> Iterator[Dict[str, Any]]:
+        """Yield log records lazily in log order.
+
+        Serves from the in-memory cache when it is current; otherwise
+        streams the JSONL file line by line, so a caller that stops
+        early never pays for parsing the rest of the log.
+        """
+        cache_key = self._logs_stat_key()
+        if cache_key is not None and cache_key == self._logs_cache_key:
+            yield from self._logs_cache
+            yield from self._pending
+            return
+        if self._logs_file_is_legacy():
+            # The old array format has to be parsed whole regardless.
+            yield from self._parse_logs()
+            yield from self._pending
+            return
+        try:
+            handle = open(self._logs_path(), "r", encoding="utf-8")
+        except OSError:
+            return
+        with handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield _json.loads(line)
+                except ValueError:
+                    continue
+        yield from self._pending
+
+    def iter_commits(self) -> List[Dict[str, Any]]:
+        """Commit records only, in log order, without re-filtering.
+
+        ``_by_version_id`` is rebuilt alongside the log cache and dicts
+        preserve insertion order, so this is the already-partitioned view
+        of the log — dedupe and other event records never show up here.
+        """
+        self.read_logs()
+        return list(self._by_version_id.values())
+
+    def get_version_record(self, version_id: str) -> Optional[Dict[str, Any]]:
+        index = self._index_handle()
+        if index is not None:
+            try:
+                record = index.get(version_id)
+            except sqlite3.Error:
+                record = None
+            if record is not None:
+                return record
+
+        for record in reversed(self._pending):
+            if (
+                record.get("event_type", "commit") == "commit"
+                and str(record.get("version_id")) == version_id
+            ):
+                return record
+
+        for record in self.iter_logs():
+            if (
+                record.get("event_type", "commit") == "commit"
+                and str(record.get("version_id")) == version_id
+            ):
+                if index is not None:
+                    # Backfill records that predate the index (or a
+                    # deleted db).
+                    try:
+                        index.insert(record)
+                    except sqlite3.Error:
+                        pass
+                return record
+        return None
+
+    @staticmethod
+    def _input_fingerprint(dataset_file: Path) -> Optional[str]:
+        """Stat-based identity for a raw input: path + size + mtime + algorithm."""
+        try:
+            stat = os.stat(dataset_file)
+        except OSError:
+            return None
+        resolved = Path(dataset_file).resolve()
+        return f"{resolved}|{stat.st_size}|{stat.st_mtime_ns}|{HASH_ALGORITHM}"
+
+    def _input_hashes(self) -> Dict[str, str]:
+        if self._input_hash_cache is None:
+            try:
+                data = _json.loads(self.input_hash_cache_file.read_bytes())
+                self._input_hash_cache = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._input_hash_cache = {}
+        return self._input_hash_cache
+
+    def get_cached_input_hash(self, dataset_file: Path) -> Optional[str]:
+        fingerprint = self._input_fingerprint(dataset_file)
+        if fingerprint is None:
+            return None
+        return self._input_hashes().get(fingerprint)
+
+    def store_input_hash(self, dataset_file: Path, input_hash: str) -> None:
+        fingerprint = self._input_fingerprint(dataset_file)
+        if fingerprint is None:
+            return
+        cache = self._input_hashes()
+        cache[fingerprint] = input_hash
+        self.input_hash_cache_file.write_bytes(
+            _json.dumps_pretty(cache, trailing_newline=True)
         )
 
     def version_exists(self, version_id: str) -> bool:
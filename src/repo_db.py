@@ -0,0 +1,59 @@
+"""SQLite index over committed versions for O(log N) lookups.
+
+The JSONL log stays the append-only source of truth; this database is a
+derived index that RepoState consults before falling back to a log scan.
+It can always be rebuilt lazily from the log, so losing it is harmless.
+"""
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src import _json
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version_id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    timestamp TEXT,
+    commit_message TEXT,
+    row_count INTEGER,
+    record BLOB NOT NULL
+)
+"""
+
+
+class LogIndex:
+    def __init__(self, db_path: Path) -> None:
+        self._connection = sqlite3.connect(str(db_path))
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+
+    def insert(self, record: Dict[str, Any]) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO versions "
+            "(version_id, parent_id, timestamp, commit_message, row_count, record) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                str(record.get("version_id")),
+                record.get("parent_id"),
+                record.get("timestamp"),
+                record.get("commit_message"),
+                record.get("row_count"),
+                _json.dumps_compact(record),
+            ),
+        )
+        self._connection.commit()
+
+    def get(self, version_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection.execute(
+            "SELECT record FROM versions WHERE version_id = ?",
+            (version_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return _json.loads(row[0])
+
+    def close(self) -> None:
+        self._connection.close()